@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# =========================
+# Per-view aggregates (cached)
+# =========================
+# Everything a view shows is computed here once per filter combination,
+# and the filtered rows are grouped once: totals and every chart frame are
+# roll-ups of that small grouped frame.
+# Previous-period and YTD totals are date slices of the small day x enforcer
+# matrix rather than scans over the rows. The frames are passed unhashed
+# (leading underscore): they are fully determined by the sheet revision and
+# the filter values, which form the key.
+
+@dataclass
+class ViewStats:
+    agg: pd.DataFrame  # Quantity per (Date|Month, Category, CategoryShort, Enforcer)
+    total: int
+    total_prev: int    # same-length block just before the selection
+    n_active: int      # enforcers with at least one row in the selection
+
+def rollup(agg: pd.DataFrame, keys) -> pd.DataFrame:
+    return agg.groupby(keys, as_index=False, observed=True, sort=False)["Quantity"].sum()
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def daily_by_enforcer(_df: pd.DataFrame, revision: str) -> pd.DataFrame:
+    # Quantity per day (sorted index) and enforcer (columns), for all data
+    return (
+        _df.groupby(["Date", "Enforcer"], observed=True)["Quantity"].sum()
+        .unstack("Enforcer", fill_value=0)
+        .sort_index()
+    )
+
+def window_total(daily: pd.DataFrame, selection, start, end=None) -> int:
+    # start/end are inclusive; a sorted index makes .loc a binary search
+    cols = daily.columns.intersection(list(selection))
+    return int(daily.loc[start:end, cols].to_numpy().sum())
+
+def date_slice(frame: pd.DataFrame, d1: date, d2: date) -> pd.DataFrame:
+    # Rows dated d1..d2 inclusive. load_all() sorts by Date (NaT last), and
+    # row filters keep that order, so two binary searches replace a mask.
+    dates = frame["Date"].to_numpy()
+    lo = dates.searchsorted(np.datetime64(d1), side="left")
+    hi = dates.searchsorted(np.datetime64(d2) + np.timedelta64(1, "D"), side="left")
+    return frame.iloc[lo:hi]
+
+def date_bounds(frame: pd.DataFrame):
+    # (first, last) Date as datetime.date, or None if no row is dated. The
+    # frame is Date-sorted with NaT last, so no min()/max() scan is needed.
+    dates = frame["Date"].to_numpy()
+    n_dated = dates.searchsorted(np.datetime64("NaT"), side="left")
+    if n_dated == 0:
+        return None
+    return pd.Timestamp(dates[0]).date(), pd.Timestamp(dates[n_dated - 1]).date()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def daily_stats(
+    _daily: pd.DataFrame,
+    _dfv: pd.DataFrame,
+    revision: str,
+    selection: tuple,
+    d1: date,
+    d2: date,
+) -> ViewStats:
+    # previous window of the same length, ending the day before d1
+    start = pd.Timestamp(d1)
+    span = pd.Timedelta((d2 - d1).days + 1, unit="D")
+    prev_start, prev_end = start - span, start - pd.Timedelta(1, unit="D")
+
+    agg = _dfv.groupby(
+        ["Date", "Category", "CategoryShort", "Enforcer"], as_index=False, observed=True, sort=False
+    )["Quantity"].sum()
+    return ViewStats(
+        agg=agg,
+        total=int(agg["Quantity"].sum()),
+        total_prev=window_total(_daily, selection, prev_start, prev_end),
+        n_active=agg["Enforcer"].nunique(),
+    )
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def monthly_stats(
+    _daily: pd.DataFrame,
+    _dfv: pd.DataFrame,
+    revision: str,
+    selection: tuple,
+    months: tuple,
+) -> ViewStats:
+    # Compare to preceding block of equal length
+    if months:
+        first = min(pd.Period(m, freq="M") for m in months)
+        prev_block = pd.period_range(end=first - 1, periods=len(months), freq="M")
+        total_prev = window_total(_daily, selection, prev_block[0].start_time, prev_block[-1].end_time)
+    else:
+        total_prev = 0
+
+    agg = _dfv.groupby(
+        ["Month", "Category", "CategoryShort", "Enforcer"], as_index=False, observed=True, sort=False
+    )["Quantity"].sum()
+    return ViewStats(
+        agg=agg,
+        total=int(agg["Quantity"].sum()),
+        total_prev=total_prev,
+        n_active=agg["Enforcer"].nunique(),
+    )
@@ -0,0 +1,132 @@
+# =========================
+# Chart specs
+# =========================
+# Plain Vega-Lite dicts: the encodings never depend on the filters, so there
+# is nothing for Altair to build or validate per rerun. The aggregated frame
+# is passed separately to st.vega_lite_chart and shipped as Arrow.
+
+def daily_line_spec() -> dict:
+    return {
+        "mark": {"type": "line", "point": True},
+        "encoding": {
+            "x": {"field": "Date", "type": "temporal", "title": "Date"},
+            "y": {"field": "Quantity", "type": "quantitative", "title": "Total"},
+            "tooltip": [
+                {"field": "Date", "type": "temporal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "height": 260,
+        "title": "Total Actions per Day",
+    }
+
+def category_bar_spec() -> dict:
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Quantity", "type": "quantitative", "title": "Total"},
+            "y": {"field": "CategoryShort", "type": "nominal", "sort": "-x", "title": "Category"},
+            "color": {"field": "Enforcer", "type": "nominal"},
+            "tooltip": [
+                {"field": "Category", "type": "nominal"},
+                {"field": "Enforcer", "type": "nominal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "height": 320,
+        "title": "Category Breakdown (stacked by Enforcer)",
+    }
+
+def leaderboard_spec() -> dict:
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Quantity", "type": "quantitative", "title": "Total"},
+            "y": {"field": "Enforcer", "type": "nominal", "sort": "-x", "title": "Enforcer"},
+            "tooltip": [
+                {"field": "Enforcer", "type": "nominal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "height": 320,
+        "title": "Leaderboard (Enforcer Totals)",
+        "config": {"view": {"stroke": None}},
+    }
+
+def donut_spec() -> dict:
+    # centered, legend on new line
+    return {
+        "mark": {"type": "arc", "innerRadius": 90, "outerRadius": 140},
+        "encoding": {
+            "theta": {"field": "Quantity", "type": "quantitative", "stack": True, "title": None},
+            "color": {
+                "field": "CategoryShort",
+                "type": "nominal",
+                "legend": {"title": "Category", "orient": "bottom", "columns": 1, "labelLimit": 10000},
+            },
+            "tooltip": [
+                {"field": "Category", "type": "nominal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "width": 520,
+        "height": 420,
+        "padding": {"left": 0, "right": 0, "top": 0, "bottom": 0},
+        "title": "",
+        "config": {"view": {"stroke": None}},
+    }
+
+def heatmap_spec() -> dict:
+    return {
+        "mark": {"type": "rect"},
+        "encoding": {
+            "x": {"field": "Enforcer", "type": "nominal", "title": None},
+            "y": {"field": "CategoryShort", "type": "nominal", "title": None},
+            "color": {"field": "Quantity", "type": "quantitative", "title": "Qty"},
+            "tooltip": [
+                {"field": "CategoryShort", "type": "nominal"},
+                {"field": "Enforcer", "type": "nominal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "height": 280,
+        "title": "Heatmap: Category × Enforcer",
+    }
+
+def month_bar_spec() -> dict:
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Month", "type": "nominal", "title": "Month"},
+            "y": {"field": "Quantity", "type": "quantitative", "title": "Total"},
+            "color": {"field": "Enforcer", "type": "nominal"},
+            "tooltip": [
+                {"field": "Month", "type": "nominal"},
+                {"field": "Enforcer", "type": "nominal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "height": 280,
+        "title": "Total Actions per Month (by Enforcer)",
+    }
+
+def category_month_spec() -> dict:
+    # stacked by Enforcer, faceted by Category
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Month", "type": "nominal", "title": "Month"},
+            "y": {"field": "Quantity", "type": "quantitative"},
+            "color": {"field": "Enforcer", "type": "nominal"},
+            "column": {"field": "CategoryShort", "type": "nominal", "title": None},
+            "tooltip": [
+                {"field": "Month", "type": "nominal"},
+                {"field": "Category", "type": "nominal"},
+                {"field": "Enforcer", "type": "nominal"},
+                {"field": "Quantity", "type": "quantitative"},
+            ],
+        },
+        "height": 280,
+        "title": "Category Breakdown by Month (stacked by Enforcer)",
+        "resolve": {"scale": {"y": "independent"}},
+    }
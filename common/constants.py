@@ -0,0 +1,68 @@
+# =========================
+# Config
+# =========================
+SHEET_ID = "1O39vIMeCq-Z5GEWzoMM4xjNwiQNCeBa-pzGdOvp2zwg"
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+EXPECTED_HEADERS = ["Date", "Enforcer", "Category", "Activity", "Quantity", "Remarks"]
+
+# The real roster (no empty placeholder); the entry page prepends "" itself
+ENFORCERS = [
+    "Den Mark T. Caliguid",
+    "Hardie Luis T. Teodoro",
+    "John Jordan L. Cello",
+    "Jan Lemuel F. Antazo",
+    "Herlito R. Pillas",
+    "Bench King O. Sunga",
+    "Melvin A. Munar",
+]
+
+# =========================
+# Activity catalogue
+# =========================
+# Imported modules are not re-executed on Streamlit reruns, so this is built
+# once per process instead of on every widget interaction.
+CATEGORIES = {
+    "I. Issuance of Citation Tickets": [
+        "No Tree-Cutting Permit",
+        "Unregistered Chainsaw",
+        "Violation of Plastics Ordinance",
+        "Violation of Solid Waste Management Ordinance",
+        "Open Dumping of Waste",
+        "Violation of Tapat Ko, Linis Ko Program",
+        "Violation of Anti-Littering Ordinance",
+        "Violation of Open Burning Ordinance",
+        "Other Environmental Ordinance Violations",
+    ],
+    "II. Surveillance, Investigation, Monitoring, Documentation, and Inspection": [
+        "Binangonan Kalinisan Patrol (BKP)",
+        "Handling of Environmental Complaints",
+        "Response to Environmental Incidents",
+        "Delivery of Letters and Notices",
+        "Inspection of MRFs, Composting Facilities, and Eco-Gardens",
+    ],
+    "III. Information, Education, and Communication (IEC) Campaign": [
+        "Dissemination of IEC Materials",
+        "Assistance in Conducting IEC Campaign Activities",
+    ],
+    "IV. Other Tasks": [
+        "Other duties assigned by the MENRO or LGU",
+    ],
+}
+
+# (category, activity) pairs in display order
+FLAT_ACTIVITIES = tuple((cat, act) for cat, acts in CATEGORIES.items() for act in acts)
+
+CATEGORY_SHORT = {
+    "I. Issuance of Citation Tickets": "I. Citation Tickets",
+    "II. Surveillance, Investigation, Monitoring, Documentation, and Inspection": "II. Surveillance & Inspection",
+    "III. Information, Education, and Communication (IEC) Campaign": "III. IEC Campaign",
+    "IV. Other Tasks": "IV. Other Tasks",
+}
+
+# Leading text that identifies each category -> its canonical label
+CATEGORY_PREFIXES = {
+    "I. Issuance of Citation": "I. Issuance of Citation Tickets",
+    "II. Surveillance": "II. Surveillance, Investigation, Monitoring, Documentation, and Inspection",
+    "III. Information, Education": "III. Information, Education, and Communication (IEC) Campaign",
+    "IV. Other": "IV. Other Tasks",
+}
@@ -0,0 +1,264 @@
+import re
+from pathlib import Path
+
+import gspread
+import pandas as pd
+import streamlit as st
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+from gspread.exceptions import WorksheetNotFound
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.constants import (
+    CATEGORIES,
+    CATEGORY_PREFIXES,
+    CATEGORY_SHORT,
+    EXPECTED_HEADERS,
+    FLAT_ACTIVITIES,
+    SCOPE,
+    SHEET_ID,
+)
+
+# =========================
+# Auth (cached)
+# =========================
+@st.cache_resource(show_spinner=False)
+def get_spreadsheet():
+    creds = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"], scopes=SCOPE
+    )
+    # Retry 429/5xx with backoff at the HTTP layer (honouring Retry-After)
+    # instead of a fixed sleep around open_by_key. Only the default
+    # idempotent methods are retried, so a Save (POST append) never repeats.
+    session = AuthorizedSession(creds)
+    session.mount("https://", HTTPAdapter(max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,  # let gspread raise its APIError on the last response
+    )))
+    client = gspread.authorize(None, session=session)
+    return client.open_by_key(SHEET_ID)
+
+# =========================
+# Worksheet helpers
+# =========================
+def get_or_create_ws(title: str):
+    spreadsheet = get_spreadsheet()
+    try:
+        return spreadsheet.worksheet(title)
+    except WorksheetNotFound:
+        ws = spreadsheet.add_worksheet(title=title, rows="2000", cols="12")
+        ws.append_row(EXPECTED_HEADERS)
+        worksheet_titles.clear()
+        return ws
+
+def ensure_headers(ws):
+    # only row 1 is fetched, and only once per tab per session
+    flag = f"hdr_ok_{ws.title}"
+    if st.session_state.get(flag):
+        return
+    header = ws.row_values(1)
+    if not header:
+        ws.append_row(EXPECTED_HEADERS)
+    elif header != EXPECTED_HEADERS:
+        ws.insert_row(EXPECTED_HEADERS, index=1)
+    st.session_state[flag] = True
+
+@st.cache_data(ttl=600, show_spinner=False)
+def worksheet_titles(revision: str) -> list[str]:
+    # keyed on the sheet revision so a tab renamed or deleted in the Sheets
+    # UI is seen on the next load; get_or_create_ws() clears it as well
+    return [ws.title for ws in get_spreadsheet().worksheets()]
+
+def _records_frame(rows: list[list]) -> pd.DataFrame:
+    # The API drops trailing empty cells, so a row without Remarks has only
+    # five values; pad every row to the header width so the frame builds even
+    # when no row in the batch is full-width.
+    width = len(EXPECTED_HEADERS)
+    return pd.DataFrame.from_records(
+        [row + [None] * (width - len(row)) for row in rows], columns=EXPECTED_HEADERS
+    )
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_records(sheet_title: str) -> pd.DataFrame:
+    # cached per tab so widget reruns don't hit the Sheets API; one
+    # list-of-lists read instead of get_all_records() building a dict per row
+    values = get_spreadsheet().worksheet(sheet_title).get(
+        "A:F",
+        value_render_option="UNFORMATTED_VALUE",
+        date_time_render_option="FORMATTED_STRING",
+    )
+    # row 1 is the header ensure_headers() keeps in place
+    df = _records_frame(values[1:])
+    # blank trailing cells come back missing; show them as empty remarks
+    return df.fillna({"Remarks": ""})
+
+# =========================
+# Category normalization
+# =========================
+_CATEGORY_PREFIX_RE = "^(" + "|".join(re.escape(p) for p in CATEGORY_PREFIXES) + ")"
+
+def canonicalize_categories(s: pd.Series) -> pd.Series:
+    """Collapse variants into one canonical label so duplicates merge."""
+    # Only a handful of distinct spellings exist: normalize those, then
+    # broadcast back to the rows through the factorize codes.
+    codes, uniques = pd.factorize(s)
+    labels = pd.Series(uniques).astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+    prefix = labels.str.extract(_CATEGORY_PREFIX_RE, expand=False)
+    labels = prefix.map(CATEGORY_PREFIXES).fillna(labels)
+    return pd.Series(labels.array.take(codes, allow_fill=True), index=s.index)
+
+# =========================
+# Date parsing
+# =========================
+def _parse_dates(raw: pd.Series) -> pd.Series:
+    # entries are written as ISO dates; a fixed format skips per-row inference
+    dates = pd.to_datetime(raw, format="%Y-%m-%d", errors="coerce", cache=True)
+    # hand-edited cells or other display formats: infer just those rather
+    # than silently dropping them from every total
+    leftover = dates.isna() & raw.notna()
+    if leftover.any():
+        # utc=True so offsets (or a mix of offsets and naive text) parse
+        # instead of raising; the day is all that's kept
+        fixed = pd.to_datetime(raw[leftover].astype(str), format="mixed", errors="coerce", utc=True)
+        dates[leftover] = fixed.dt.tz_convert(None).dt.normalize()
+    return dates
+
+# =========================
+# Load all enforcer tabs
+# =========================
+def _fetch_all(worksheet_names: list[str], revision: str) -> pd.DataFrame:
+    # One values.batchGet instead of a get_all_records() round-trip per tab.
+    # Missing tabs are dropped up front since batchGet fails the whole
+    # request on an unknown range.
+    existing = set(worksheet_titles(revision))
+    titles = [t for t in worksheet_names if t in existing]
+
+    rows = []
+    if titles:
+        # Unformatted values bring Quantity back as numbers; dates stay as
+        # their displayed YYYY-MM-DD strings.
+        resp = get_spreadsheet().values_batch_get(
+            [gspread.utils.absolute_range_name(t, "A:F") for t in titles],
+            params={
+                "valueRenderOption": "UNFORMATTED_VALUE",
+                "dateTimeRenderOption": "FORMATTED_STRING",
+            },
+        )
+        for vr in resp.get("valueRanges", []):
+            # row 1 is the header ensure_headers() keeps in place
+            rows.extend(vr.get("values", [])[1:])
+
+    # One frame with the known column order for every tab, rather than a
+    # frame per tab (each with its own dtype inference) plus a concat copy.
+    df = _records_frame(rows)
+    df["Remarks"] = df["Remarks"].astype("string")
+
+    # Clean types
+    if "Quantity" in df.columns:
+        q = df["Quantity"]
+        # Numeric columns (the usual case with UNFORMATTED_VALUE) skip
+        # to_numeric; blank cells only make the column float.
+        if q.dtype.kind in "iu":
+            df["Quantity"] = q.astype("int32")
+        elif q.dtype.kind == "f":
+            df["Quantity"] = q.fillna(0).astype("int32")
+        else:
+            # nullable result marks junk as <NA> without a float64 NaN copy
+            df["Quantity"] = (
+                pd.to_numeric(q, errors="coerce", dtype_backend="numpy_nullable")
+                .fillna(0)
+                .astype("int32")
+            )
+    if "Date" in df.columns:
+        df["Date"] = _parse_dates(df["Date"])
+        # period[M] is int64-backed: grouping/isin compare ordinals, not strings
+        df["Month"] = df["Date"].dt.to_period("M")
+
+    # Normalize category names
+    if "Category" in df.columns:
+        df["Category"] = canonicalize_categories(df["Category"])
+        df["CategoryShort"] = df["Category"].map(CATEGORY_SHORT).fillna(df["Category"])
+
+    # Clean enforcer whitespace
+    if "Enforcer" in df.columns:
+        df["Enforcer"] = df["Enforcer"].astype(str).str.strip()
+
+    # UNFORMATTED_VALUE returns numeric/boolean cells as such; keep the
+    # categories all-string (groupable, parquet-writable)
+    if "Activity" in df.columns:
+        df["Activity"] = df["Activity"].astype("string")
+
+    # Low-cardinality keys as categoricals: groupby/isin work on int codes.
+    # Every groupby on the Reports page passes observed=True so unused
+    # combinations don't come back as zero rows.
+    # Known values come first in display order (roster, catalogue); anything
+    # unexpected in the sheet is appended rather than dropped.
+    display_order = {
+        "Enforcer": worksheet_names,
+        "Category": CATEGORIES.keys(),
+        "CategoryShort": CATEGORY_SHORT.values(),
+        "Activity": [act for _, act in FLAT_ACTIVITIES],
+    }
+    for col, order in display_order.items():
+        if col in df.columns:
+            known = list(dict.fromkeys(order))
+            extra = sorted(set(df[col].dropna()) - set(known), key=str)
+            df[col] = pd.Categorical(df[col], categories=known + extra)
+
+    # Date order (undated rows last) lets views cut a date range with two
+    # binary searches; stable, so rows keep sheet order within a day.
+    if "Date" in df.columns:
+        df = df.sort_values("Date", kind="stable", ignore_index=True)
+
+    return df
+
+# =========================
+# Revision-keyed cache (memory + local parquet)
+# =========================
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache"
+CACHE_FILE = CACHE_DIR / "enforcers.parquet"
+CACHE_KEY_FILE = CACHE_DIR / "rev.txt"
+# Bump whenever _fetch_all() changes what it returns, so local copies
+# written by older code are refetched rather than served as-is.
+_CACHE_VERSION = 2
+
+@st.cache_data(ttl=60, show_spinner=False)
+def sheet_revision() -> str:
+    # Drive's modifiedTime for the spreadsheet: one small metadata call
+    return get_spreadsheet().get_lastUpdateTime()
+
+def _read_local(key: str):
+    try:
+        if CACHE_KEY_FILE.read_text() == key:
+            return pd.read_parquet(CACHE_FILE, engine="pyarrow")
+    except Exception:
+        pass  # no usable local copy; fall back to Sheets
+    return None
+
+def _write_local(key: str, df: pd.DataFrame):
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        # drop the key first so a half-written parquet is never trusted
+        CACHE_KEY_FILE.unlink(missing_ok=True)
+        df.to_parquet(CACHE_FILE, engine="pyarrow", index=False)
+        CACHE_KEY_FILE.write_text(key)
+    except Exception:
+        pass  # best effort (read-only disk, unwritable frame): memory cache still works
+
+@st.cache_resource(max_entries=2)
+def load_all(worksheet_names: list[str], revision: str) -> pd.DataFrame:
+    """All enforcer rows, refetched from Sheets only when `revision` changes.
+
+    Reruns with an unchanged revision get the same in-memory frame (shared
+    across sessions, so treat it as read-only), and a cold process reads the
+    local parquet copy instead of the network.
+    """
+    key = f"v{_CACHE_VERSION}\n{revision}\n{'|'.join(worksheet_names)}"
+    df = _read_local(key)
+    if df is None:
+        df = _fetch_all(worksheet_names, revision)
+        _write_local(key, df)
+    return df
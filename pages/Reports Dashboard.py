@@ -1,123 +1,36 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
-import altair as alt
-import time
 from datetime import date
 
-# ======================
-# Config
-# ======================
-SHEET_ID = "1O39vIMeCq-Z5GEWzoMM4xjNwiQNCeBa-pzGdOvp2zwg"
-
-# Use the real roster here (no empty string)
-ENFORCERS = [
-    "Den Mark T. Caliguid",
-    "Hardie Luis T. Teodoro",
-    "John Jordan L. Cello",
-    "Jan Lemuel F. Antazo",
-    "Herlito R. Pillas",
-    "Bench King O. Sunga",
-    "Melvin A. Munar",
-]
-
-EXPECTED_HEADERS = ["Date", "Enforcer", "Category", "Activity", "Quantity", "Remarks"]
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+from common.aggregates import (
+    daily_by_enforcer,
+    daily_stats,
+    date_bounds,
+    date_slice,
+    monthly_stats,
+    rollup,
+    window_total,
+)
+from common.charts import (
+    category_bar_spec,
+    category_month_spec,
+    daily_line_spec,
+    donut_spec,
+    heatmap_spec,
+    leaderboard_spec,
+    month_bar_spec,
+)
+from common.constants import ENFORCERS
+from common.sheets_io import load_all, sheet_revision
 
 st.set_page_config(page_title="Reports Dashboard", layout="wide")
 st.title("📊 Reports Dashboard")
 
-# ======================
-# Auth & Sheet
-# ======================
-@st.cache_resource(show_spinner=False)
-def get_spreadsheet():
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(
-        st.secrets["gcp_service_account"], SCOPE
-    )
-    client = gspread.authorize(creds)
-    # tiny retry for transient 5xx
-    for i in range(3):
-        try:
-            return client.open_by_key(SHEET_ID)
-        except Exception:
-            if i == 2:
-                raise
-            time.sleep(1.2)
-
-spreadsheet = get_spreadsheet()
-
-# ======================
-# Category normalization
-# ======================
-def canonicalize_category(s: str) -> str:
-    """Collapse variants into one canonical label so duplicates merge."""
-    if not isinstance(s, str):
-        s = str(s)
-    s = " ".join(s.strip().split())
-
-    CANON_I   = "I. Issuance of Citation Tickets"
-    CANON_II  = "II. Surveillance, Investigation, Monitoring, Documentation, and Inspection"
-    CANON_III = "III. Information, Education, and Communication (IEC) Campaign"
-    CANON_IV  = "IV. Other Tasks"
-
-    if s.startswith("I. Issuance of Citation"):
-        return CANON_I
-    if s.startswith("II. Surveillance"):
-        return CANON_II
-    if s.startswith("III. Information, Education"):
-        return CANON_III
-    if s.startswith("IV. Other"):
-        return CANON_IV
-    return s
-
-CATEGORY_SHORT = {
-    "I. Issuance of Citation Tickets": "I. Citation Tickets",
-    "II. Surveillance, Investigation, Monitoring, Documentation, and Inspection": "II. Surveillance & Inspection",
-    "III. Information, Education, and Communication (IEC) Campaign": "III. IEC Campaign",
-    "IV. Other Tasks": "IV. Other Tasks",
-}
-
 # ======================
 # Load data (cached)
 # ======================
-@st.cache_data(ttl=60)
-def load_all(worksheet_names: list[str]) -> pd.DataFrame:
-    frames = []
-    for title in worksheet_names:
-        try:
-            ws = spreadsheet.worksheet(title)
-        except gspread.exceptions.WorksheetNotFound:
-            continue
-        recs = ws.get_all_records()
-        if recs:
-            frames.append(pd.DataFrame(recs))
-
-    if not frames:
-        df = pd.DataFrame(columns=EXPECTED_HEADERS)
-    else:
-        df = pd.concat(frames, ignore_index=True)
-
-    # Clean types
-    if "Quantity" in df.columns:
-        df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce").fillna(0).astype(int)
-    if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df["Month"] = df["Date"].dt.strftime("%Y-%m")
-
-    # Normalize category names
-    if "Category" in df.columns:
-        df["Category"] = df["Category"].apply(canonicalize_category)
-        df["CategoryShort"] = df["Category"].map(lambda x: CATEGORY_SHORT.get(x, x))
-
-    # Clean enforcer whitespace
-    if "Enforcer" in df.columns:
-        df["Enforcer"] = df["Enforcer"].astype(str).str.strip()
-
-    return df
-
-df = load_all(ENFORCERS)
+revision = sheet_revision()
+df = load_all(ENFORCERS, revision)
 
 # ======================
 # Controls
@@ -130,19 +43,18 @@ with left:
 if "enf_filter" not in st.session_state:
     st.session_state.enf_filter = []
 
+# on_click callbacks run before the script, so the one rerun the click
+# already causes picks up the new selection; no st.rerun() needed
 def _select_all():
-    st.session_state.enf_filter = ENFORCERS[:]
-    st.rerun()
+    st.session_state.enf_filter = list(ENFORCERS)
 
 def _clear_all():
     st.session_state.enf_filter = []
-    st.rerun()
 
 with right:
     chosen = st.multiselect(
         "Filter Enforcers",
         ENFORCERS,
-        default=st.session_state.enf_filter,
         key="enf_filter",
     )
     b1, b2 = st.columns([1,1])
@@ -151,6 +63,9 @@ with right:
     with b2:
         st.button("Clear", on_click=_clear_all, use_container_width=True)
 
+# both views' YTD KPI count from Jan 1 of the current year
+year_start = date.today().replace(month=1, day=1)
+
 # Treat empty selection as ALL
 effective_selection = chosen if chosen else ENFORCERS
 dfv = df[df["Enforcer"].isin(effective_selection)] if not df.empty else df
@@ -159,6 +74,9 @@ if dfv.empty:
     st.info("No data to display for the current selection.")
     st.stop()
 
+# day x enforcer totals behind the previous-period and YTD KPIs
+daily = daily_by_enforcer(df, revision)
+
 # ======================
 # KPI helpers
 # ======================
@@ -186,7 +104,9 @@ def percent_change(curr: float, prev: float):
 def download_filtered(name: str, frame: pd.DataFrame):
     st.download_button(
         f"⬇️ Download {name} CSV",
-        frame.to_csv(index=False),
+        # deferred: the CSV is built only when the button is clicked,
+        # not on every rerun that draws the button
+        lambda: frame.to_csv(index=False),
         f"{name.lower().replace(' ', '_')}.csv",
         "text/csv",
     )
@@ -194,12 +114,16 @@ def download_filtered(name: str, frame: pd.DataFrame):
 # ======================
 # DAILY VIEW
 # ======================
-if view == "Daily":
-    if dfv["Date"].isna().all():
+# Each view runs as a fragment: its own widgets (date range, months) rerun
+# only the view, not the data load and enforcer filter above.
+@st.fragment
+def daily_view(dfv: pd.DataFrame):
+    bounds = date_bounds(dfv)
+    if bounds is None:
         st.info("No valid dates found in the data.")
-        st.stop()
+        return
 
-    min_d, max_d = dfv["Date"].min().date(), dfv["Date"].max().date()
+    min_d, max_d = bounds
     d1, d2 = st.date_input(
         "Date range",
         (min_d, max_d),
@@ -207,33 +131,26 @@ if view == "Daily":
         max_value=max_d,
     )
 
-    dfv = dfv[(dfv["Date"] >= pd.to_datetime(d1)) & (dfv["Date"] <= pd.to_datetime(d2))]
+    dfv = date_slice(dfv, d1, d2)
     if dfv.empty:
         st.info("No data in the selected date range.")
-        st.stop()
+        return
+
+    stats = daily_stats(daily, dfv, revision, tuple(effective_selection), d1, d2)
+    agg = stats.agg
 
     # --- KPIs ---
-    total_today = int(dfv["Quantity"].sum())
-    span_days = (pd.to_datetime(d2) - pd.to_datetime(d1)).days + 1
-    prev_start = pd.to_datetime(d1) - pd.Timedelta(days=span_days)
-    prev_end = pd.to_datetime(d1) - pd.Timedelta(days=1)
-    prev_df = df[(df["Enforcer"].isin(effective_selection)) &
-                 (df["Date"] >= prev_start) & (df["Date"] <= prev_end)]
-    total_prev = int(prev_df["Quantity"].sum()) if not prev_df.empty else 0
-    pct_vs_yday = percent_change(total_today, total_prev)
-
-    prod = (
-        dfv.groupby("Enforcer", as_index=False)["Quantity"].sum()
-        .sort_values("Quantity", ascending=False)
-    )
-    top_enforcer = prod.iloc[0]["Enforcer"] if not prod.empty else "—"
-    top_enforcer_actions = int(prod.iloc[0]["Quantity"]) if not prod.empty else 0
+    total_today = stats.total
+    pct_vs_yday = percent_change(total_today, stats.total_prev)
 
-    pct_active = 100.0 * (dfv["Enforcer"].nunique() / len(effective_selection)) if len(effective_selection) else 0.0
+    prod = rollup(agg, "Enforcer")
+    # only the top row is needed: idxmax instead of sorting every total
+    top = prod.loc[prod["Quantity"].idxmax()] if not prod.empty else None
+    top_enforcer = top["Enforcer"] if top is not None else "—"
+    top_enforcer_actions = int(top["Quantity"]) if top is not None else 0
 
-    year_start = pd.to_datetime(date.today().replace(month=1, day=1))
-    ytd_df = df[(df["Enforcer"].isin(effective_selection)) & (df["Date"] >= year_start)]
-    ytd_total = int(ytd_df["Quantity"].sum()) if not ytd_df.empty else 0
+    pct_active = 100.0 * (stats.n_active / len(effective_selection)) if len(effective_selection) else 0.0
+    ytd = window_total(daily, effective_selection, pd.Timestamp(year_start))
 
     c1, c2, c3, c4 = st.columns(4)
     with c1:
@@ -249,154 +166,62 @@ if view == "Daily":
         kpi_badge(pct_vs_yday)
     with c4:
         st.caption("Cumulative total (YTD)")
-        st.subheader(f"{ytd_total}")
+        st.subheader(f"{ytd}")
 
     # --- Charts ---
-    daily_tot = dfv.groupby("Date", as_index=False)["Quantity"].sum()
-    st.altair_chart(
-        alt.Chart(daily_tot)
-        .mark_line(point=True)
-        .encode(
-            x=alt.X("Date:T", title="Date"),
-            y=alt.Y("Quantity:Q", title="Total"),
-            tooltip=["Date:T", "Quantity:Q"],
-        )
-        .properties(height=260, title="Total Actions per Day"),
-        use_container_width=True,
-    )
+    daily_tot = rollup(agg, "Date")
+    st.vega_lite_chart(daily_tot, daily_line_spec(), use_container_width=True)
 
-    cat_tot = dfv.groupby(["Category", "CategoryShort", "Enforcer"], as_index=False)["Quantity"].sum()
-    st.altair_chart(
-        alt.Chart(cat_tot)
-        .mark_bar()
-        .encode(
-            x=alt.X("Quantity:Q", title="Total"),
-            y=alt.Y("CategoryShort:N", sort="-x", title="Category"),
-            color=alt.Color("Enforcer:N"),
-            tooltip=["Category:N", "Enforcer:N", "Quantity:Q"],
-        )
-        .properties(height=320, title="Category Breakdown (stacked by Enforcer)"),
-        use_container_width=True,
-    )
+    cat_tot = rollup(agg, ["Category", "CategoryShort", "Enforcer"])
+    st.vega_lite_chart(cat_tot, category_bar_spec(), use_container_width=True)
 
     # Leaderboard — SAFE reindex (prevents phantom 1s)
     leader = (
-        dfv.groupby("Enforcer", as_index=False)["Quantity"].sum()
-        .set_index("Enforcer")
+        prod.set_index("Enforcer")
         .reindex(effective_selection, fill_value=0)   # <- key line
         .reset_index()
     )
     leader["Quantity"] = pd.to_numeric(leader["Quantity"], errors="coerce").fillna(0).astype(int)
 
     st.markdown("### 📌 Summary Charts")
-    st.altair_chart(
-        alt.Chart(leader)
-        .mark_bar()
-        .encode(
-            x=alt.X("Quantity:Q", title="Total"),
-            y=alt.Y("Enforcer:N", sort="-x", title="Enforcer"),
-            tooltip=["Enforcer:N", "Quantity:Q"],
-        )
-        .properties(height=320, title="Leaderboard (Enforcer Totals)")
-        .configure_view(stroke=None),
-        use_container_width=True,
-    )
+    st.vega_lite_chart(leader, leaderboard_spec(), use_container_width=True)
 
-    # Donut (centered, legend on new line)
-    cat_share = (
-        dfv.groupby(["Category", "CategoryShort"], as_index=False)["Quantity"].sum()
-        .sort_values("Quantity", ascending=False)
-    )
-    donut = (
-        alt.Chart(cat_share, title="")
-        .mark_arc(innerRadius=90, outerRadius=140)
-        .encode(
-            theta=alt.Theta("Quantity:Q", stack=True, title=None),
-            color=alt.Color(
-                "CategoryShort:N",
-                legend=alt.Legend(
-                    title="Category",
-                    orient="bottom",
-                    columns=1,
-                    labelLimit=10000
-                ),
-            ),
-            tooltip=["Category:N", "Quantity:Q"],
-        )
-        .properties(width=520, height=420, padding={"left": 0, "right": 0, "top": 0, "bottom": 0})
-        .configure_view(stroke=None)
-    )
+    # Donut (centered)
+    cat_share = rollup(agg, ["Category", "CategoryShort"]).sort_values("Quantity", ascending=False)
     lp, mid, rp = st.columns([1, 2, 1])
     with mid:
-        st.altair_chart(donut, use_container_width=False)
-
-    heat = dfv.groupby(["CategoryShort", "Enforcer"], as_index=False)["Quantity"].sum()
-    st.altair_chart(
-        alt.Chart(heat)
-        .mark_rect()
-        .encode(
-            x=alt.X("Enforcer:N", title=None),
-            y=alt.Y("CategoryShort:N", title=None),
-            color=alt.Color("Quantity:Q", title="Qty"),
-            tooltip=["CategoryShort:N", "Enforcer:N", "Quantity:Q"],
-        )
-        .properties(height=280, title="Heatmap: Category × Enforcer"),
-        use_container_width=True,
-    )
+        st.vega_lite_chart(cat_share, donut_spec(), use_container_width=False)
+
+    heat = rollup(agg, ["CategoryShort", "Enforcer"])
+    st.vega_lite_chart(heat, heatmap_spec(), use_container_width=True)
 
     download_filtered("Daily filtered", dfv)
 
 # ======================
 # MONTHLY VIEW
 # ======================
-else:
+@st.fragment
+def monthly_view(dfv: pd.DataFrame):
     months = sorted(dfv["Month"].dropna().unique())
     sel = st.multiselect("Select Month(s)", months, default=months)
     if sel:
         dfv = dfv[dfv["Month"].isin(sel)]
     if dfv.empty:
         st.info("No data for the selected month(s).")
-        st.stop()
-
-    total_month = int(dfv["Quantity"].sum())
+        return
 
-    # Compare to preceding block of equal length
-    if sel:
-        sel_sorted = sorted(sel)
-        block_len = len(sel_sorted)
-
-        def prev_month(mstr):
-            y, m = map(int, mstr.split("-"))
-            if m == 1:
-                return f"{y-1}-12"
-            return f"{y}-{m-1:02d}"
-
-        prev_end_m = prev_month(sel_sorted[0])
-        prev_block = []
-        cur = prev_end_m
-        for _ in range(block_len):
-            prev_block.append(cur)
-            cur = prev_month(cur)
-        prev_block = list(reversed(prev_block))
-        prev_df = df[(df["Enforcer"].isin(effective_selection)) & (df["Month"].isin(prev_block))]
-        total_prev = int(prev_df["Quantity"].sum()) if not prev_df.empty else 0
-    else:
-        total_prev = 0
-
-    pct_vs_prev_months = percent_change(total_month, total_prev)
-
-    prod_m = (
-        dfv.groupby("Enforcer", as_index=False)["Quantity"].sum()
-        .sort_values("Quantity", ascending=False)
-    )
-    top_enforcer_m = prod_m.iloc[0]["Enforcer"] if not prod_m.empty else "—"
-    top_enforcer_actions_m = int(prod_m.iloc[0]["Quantity"]) if not prod_m.empty else 0
+    stats_m = monthly_stats(daily, dfv, revision, tuple(effective_selection), tuple(str(m) for m in sel))
+    agg_m = stats_m.agg
+    total_month = stats_m.total
+    pct_vs_prev_months = percent_change(total_month, stats_m.total_prev)
 
-    pct_active_m = 100.0 * (dfv["Enforcer"].nunique() / len(effective_selection)) if len(effective_selection) else 0.0
+    prod_m = rollup(agg_m, "Enforcer")
+    top_m = prod_m.loc[prod_m["Quantity"].idxmax()] if not prod_m.empty else None
+    top_enforcer_m = top_m["Enforcer"] if top_m is not None else "—"
+    top_enforcer_actions_m = int(top_m["Quantity"]) if top_m is not None else 0
 
-    year_start = pd.to_datetime(date.today().replace(month=1, day=1))
-    ytd_df = df[(df["Enforcer"].isin(effective_selection)) & (df["Date"] >= year_start)]
-    ytd_total = int(ytd_df["Quantity"].sum()) if not ytd_df.empty else 0
+    pct_active_m = 100.0 * (stats_m.n_active / len(effective_selection)) if len(effective_selection) else 0.0
+    ytd = window_total(daily, effective_selection, pd.Timestamp(year_start))
 
     c1, c2, c3, c4 = st.columns(4)
     with c1:
@@ -412,66 +237,53 @@ else:
         kpi_badge(pct_vs_prev_months)
     with c4:
         st.caption("Cumulative total (YTD)")
-        st.subheader(f"{ytd_total}")
+        st.subheader(f"{ytd}")
 
     # Totals per month (by Enforcer)
-    month_enf = dfv.groupby(["Month", "Enforcer"], as_index=False)["Quantity"].sum()
-    st.altair_chart(
-        alt.Chart(month_enf)
-        .mark_bar()
-        .encode(
-            x=alt.X("Month:N", title="Month"),
-            y=alt.Y("Quantity:Q", title="Total"),
-            color=alt.Color("Enforcer:N"),
-            tooltip=["Month:N", "Enforcer:N", "Quantity:Q"],
-        )
-        .properties(height=280, title="Total Actions per Month (by Enforcer)"),
-        use_container_width=True,
-    )
+    month_enf = rollup(agg_m, ["Month", "Enforcer"])
+    month_enf["Month"] = month_enf["Month"].astype(str)
+    st.vega_lite_chart(month_enf, month_bar_spec(), use_container_width=True)
 
     # Category by month (stacked by Enforcer, faceted by Category)
-    cat_month_enf = dfv.groupby(["Month", "Category", "CategoryShort", "Enforcer"], as_index=False)["Quantity"].sum()
-    st.altair_chart(
-        alt.Chart(cat_month_enf)
-        .mark_bar()
-        .encode(
-            x=alt.X("Month:N", title="Month"),
-            y=alt.Y("Quantity:Q"),
-            color=alt.Color("Enforcer:N"),
-            column=alt.Column("CategoryShort:N", title=None),
-            tooltip=["Month:N", "Category:N", "Enforcer:N", "Quantity:Q"],
-        )
-        .properties(height=280, title="Category Breakdown by Month (stacked by Enforcer)")
-        .resolve_scale(y="independent"),
-        use_container_width=True,
-    )
+    cat_month_enf = agg_m.copy()
+    cat_month_enf["Month"] = cat_month_enf["Month"].astype(str)
+    st.vega_lite_chart(cat_month_enf, category_month_spec(), use_container_width=True)
 
     # Donut (centered)
-    cat_share_m = (
-        dfv.groupby(["Category", "CategoryShort"], as_index=False)["Quantity"].sum()
-        .sort_values("Quantity", ascending=False)
-    )
-    donut_m = (
-        alt.Chart(cat_share_m, title="")
-        .mark_arc(innerRadius=90, outerRadius=140)
-        .encode(
-            theta=alt.Theta("Quantity:Q", stack=True, title=None),
-            color=alt.Color(
-                "CategoryShort:N",
-                legend=alt.Legend(
-                    title="Category",
-                    orient="bottom",
-                    columns=1,
-                    labelLimit=10000
-                ),
-            ),
-            tooltip=["Category:N", "Quantity:Q"],
-        )
-        .properties(width=520, height=420, padding={"left": 0, "right": 0, "top": 0, "bottom": 0})
-        .configure_view(stroke=None)
-    )
+    cat_share_m = rollup(agg_m, ["Category", "CategoryShort"]).sort_values("Quantity", ascending=False)
     lp, mid, rp = st.columns([1, 2, 1])
     with mid:
-        st.altair_chart(donut_m, use_container_width=False)
+        st.vega_lite_chart(cat_share_m, donut_spec(), use_container_width=False)
 
     download_filtered("Monthly filtered", dfv)
+
+# ======================
+# Render
+# ======================
+if view == "Daily":
+    daily_view(dfv)
+else:
+    monthly_view(dfv)
+
+# ======================
+# Cache stats (?debug=1)
+# ======================
+# Bytes held per st.cache_data function, to check that reruns reuse entries
+# instead of piling up new keys. Streamlit keeps no hit/miss counters, and
+# st.cache_resource (load_all) sizes aren't measured by default.
+if st.query_params.get("debug") == "1":
+    with st.sidebar:
+        st.markdown("### 🛠 Cache stats")
+        st.caption(f"Sheet revision: {revision}")
+        try:
+            # Streamlit internal, imported only here so a move can't break the page
+            from streamlit.runtime.caching import get_data_cache_stats_provider
+        except ImportError:
+            st.caption("Cache stats are unavailable in this Streamlit version.")
+        else:
+            cache_stats = [
+                {"Function": stat.cache_name, "Bytes": stat.byte_length}
+                for family in get_data_cache_stats_provider().get_stats().values()
+                for stat in family
+            ]
+            st.dataframe(pd.DataFrame(cache_stats, columns=["Function", "Bytes"]), hide_index=True)
@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+from common.constants import EXPECTED_HEADERS
+from common.sheets_io import _parse_dates, _records_frame
+
+
+class RecordsFrameTest(unittest.TestCase):
+    def test_all_rows_short(self):
+        # no remarks anywhere: the API returns five values per row
+        rows = [
+            ["2025-01-02", "A", "Cat", "Act", 3],
+            ["2025-01-03", "B", "Cat", "Act", 1],
+        ]
+        df = _records_frame(rows)
+        self.assertEqual(list(df.columns), EXPECTED_HEADERS)
+        self.assertEqual(len(df), 2)
+        self.assertTrue(df["Remarks"].isna().all())
+
+    def test_mixed_widths(self):
+        rows = [
+            ["2025-01-02", "A", "Cat", "Act", 3, "note"],
+            ["2025-01-03", "B", "Cat"],
+        ]
+        df = _records_frame(rows)
+        self.assertEqual(df.loc[0, "Remarks"], "note")
+        self.assertTrue(df.loc[1, ["Activity", "Quantity", "Remarks"]].isna().all())
+
+    def test_empty(self):
+        df = _records_frame([])
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), EXPECTED_HEADERS)
+
+
+class ParseDatesTest(unittest.TestCase):
+    def test_fallback_values(self):
+        raw = pd.Series([
+            "2025-01-02",                 # ISO, fast path
+            "1/3/2025",                   # other display format
+            "2025-01-04T10:00:00+08:00",  # hand-edited with an offset
+            "2025-01-05T08:00:00Z",
+            "junk",
+            "",
+            None,
+        ], dtype=object)
+        dates = _parse_dates(raw)
+        self.assertEqual(
+            dates.dt.strftime("%Y-%m-%d").tolist()[:4],
+            ["2025-01-02", "2025-01-03", "2025-01-04", "2025-01-05"],
+        )
+        self.assertTrue(dates[4:].isna().all())
+        self.assertIsNone(dates.dt.tz)
+
+
+if __name__ == "__main__":
+    unittest.main()